@@ -1,26 +1,84 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+import functools
+from flask import Blueprint, Flask, current_app, render_template, request, redirect, url_for, flash, g
+from werkzeug.local import LocalProxy
 from backend import PetWorld, SHOP_ITEMS
 
-app = Flask(__name__)
-app.secret_key = "perverse-secret-key"  # required for flash messages
+bp = Blueprint("petverse", __name__)
 
-# create global world object
-world = PetWorld()
+# the app's PetWorld, looked up per request from current_app.extensions
+world = LocalProxy(lambda: current_app.extensions["world"])
+
+
+def create_app(config=None):
+    """Build the Flask app and load the world once; nothing is read at import time."""
+    app = Flask(__name__)
+    app.secret_key = "perverse-secret-key"  # required for flash messages
+    # applied before the world is built so e.g. DEBUG reaches it
+    app.config.update(config or {})
+
+    # readable save files when debugging
+    app.extensions["world"] = pet_world = PetWorld(pretty=app.debug)
+    # docker stop / systemd send SIGTERM, which skips the atexit flush
+    pet_world.install_sigterm_flush()
+    app.register_blueprint(bp)
+    return app
+
+
+@bp.before_app_request
+def start_world():
+    """Start the world's background threads on the first request this process serves."""
+    # not in create_app(): the debug reloader's watching parent builds an app
+    # too, and must not tick or save its own stale copy of the pets
+    world.start()
+
+
+@bp.before_request
+def load_pet():
+    """Look up the pet named in /pet/<name>/... URLs once, before the view runs."""
+    name = (request.view_args or {}).get("name")
+    g.pet = world.get_pet(name) if name is not None else None
+
+
+def requires_pet(view):
+    """Send the user home with "Pet not found." unless load_pet() found the pet."""
+    @functools.wraps(view)
+    def wrapper(name):
+        if g.pet is None:
+            flash("Pet not found.")
+            return redirect(url_for("petverse.index"))
+        return view(name)
+    return wrapper
+
+
+def form_minutes(default):
+    """Positive `minutes` from the form, or None; blank or non-numeric input uses the default."""
+    minutes = request.form.get("minutes", default, type=int)
+    return minutes if minutes > 0 else None
+
+
+def pet_status(pet):
+    """pet.status() memoized for the current request (the cache lives on flask.g)."""
+    cache = g.setdefault("_status_cache", {})
+    status = cache.get(pet.name)
+    if status is None:
+        status = cache[pet.name] = pet.status()
+    return status
 
 
 # -----------------------------
 # HOME PAGE
 # -----------------------------
-@app.route("/")
+@bp.route("/")
 def index():
-    pets = [p.status() for p in world.pets.values()]
+    # read-only: background ticks advance the pets, browsing never does
+    pets = [p.view_status() for p in world.all_pets()]
     return render_template("index.html", pets=pets)
 
 
 # -----------------------------
 # CREATE PET
 # -----------------------------
-@app.route("/create", methods=["POST"])
+@bp.route("/create", methods=["POST"])
 def create():
     name = request.form.get("name", "").strip()
     species = request.form.get("species", "cat").strip().lower()
@@ -29,156 +87,151 @@ def create():
     flash(msg)
 
     if ok:
-        world.save()
+        world.mark_dirty(name)
 
-    return redirect(url_for("index"))
+    return redirect(url_for("petverse.index"))
 
 
 # -----------------------------
 # PET DETAILS PAGE
 # -----------------------------
-@app.route("/pet/<name>")
+@bp.route("/pet/<name>")
+@requires_pet
 def pet_page(name):
-    pet = world.get_pet(name)
-    if not pet:
-        flash("Pet not found.")
-        return redirect(url_for("index"))
+    pet = g.pet
 
-    return render_template("pet.html", pet=pet.status(), shop=SHOP_ITEMS)
+    return render_template("pet.html", pet=pet_status(pet), shop=SHOP_ITEMS)
 
 
 # -----------------------------
 # FEED PET
 # -----------------------------
-@app.route("/pet/<name>/feed", methods=["POST"])
+@bp.route("/pet/<name>/feed", methods=["POST"])
+@requires_pet
 def feed(name):
-    pet = world.get_pet(name)
-    if not pet:
-        flash("Pet not found.")
-        return redirect(url_for("index"))
+    pet = g.pet
 
     ok, msg = pet.feed()
     flash(msg)
 
     if ok:
-        world.save()
+        world.mark_dirty(name)
 
-    return redirect(url_for("pet_page", name=name))
+    return redirect(url_for("petverse.pet_page", name=name))
 
 
 # -----------------------------
 # PLAY WITH PET
 # -----------------------------
-@app.route("/pet/<name>/play", methods=["POST"])
+@bp.route("/pet/<name>/play", methods=["POST"])
+@requires_pet
 def play(name):
-    pet = world.get_pet(name)
-    if not pet:
-        flash("Pet not found.")
-        return redirect(url_for("index"))
+    pet = g.pet
 
-    minutes = int(request.form.get("minutes", 10))
+    minutes = form_minutes(10)
+    if minutes is None:
+        flash("Minutes must be a positive number.")
+        return redirect(url_for("petverse.pet_page", name=name))
     ok, msg = pet.play(minutes)
 
     flash(msg)
     if ok:
-        world.save()
+        world.mark_dirty(name)
 
-    return redirect(url_for("pet_page", name=name))
+    return redirect(url_for("petverse.pet_page", name=name))
 
 
 # -----------------------------
 # PET REST
 # -----------------------------
-@app.route("/pet/<name>/rest", methods=["POST"])
+@bp.route("/pet/<name>/rest", methods=["POST"])
+@requires_pet
 def rest(name):
-    pet = world.get_pet(name)
-    if not pet:
-        flash("Pet not found.")
-        return redirect(url_for("index"))
+    pet = g.pet
 
-    minutes = int(request.form.get("minutes", 30))
+    minutes = form_minutes(30)
+    if minutes is None:
+        flash("Minutes must be a positive number.")
+        return redirect(url_for("petverse.pet_page", name=name))
     ok, msg = pet.rest(minutes)
 
     flash(msg)
     if ok:
-        world.save()
+        world.mark_dirty(name)
 
-    return redirect(url_for("pet_page", name=name))
+    return redirect(url_for("petverse.pet_page", name=name))
 
 
 # -----------------------------
 # BUY SHOP ITEM
 # -----------------------------
-@app.route("/pet/<name>/buy", methods=["POST"])
+@bp.route("/pet/<name>/buy", methods=["POST"])
+@requires_pet
 def buy(name):
-    pet = world.get_pet(name)
-    if not pet:
-        flash("Pet not found.")
-        return redirect(url_for("index"))
+    pet = g.pet
 
     item_key = request.form.get("item_key")
     ok, msg = pet.buy_item(item_key)
 
     flash(msg)
     if ok:
-        world.save()
+        world.mark_dirty(name)
 
-    return redirect(url_for("pet_page", name=name))
+    return redirect(url_for("petverse.pet_page", name=name))
 
 
 # -----------------------------
 # DAILY REWARD
 # -----------------------------
-@app.route("/pet/<name>/daily", methods=["POST"])
+@bp.route("/pet/<name>/daily", methods=["POST"])
+@requires_pet
 def daily_reward(name):
-    pet = world.get_pet(name)
-    if not pet:
-        flash("Pet not found.")
-        return redirect(url_for("index"))
+    pet = g.pet
 
     ok, msg = pet.daily_reward()
     flash(msg)
 
     if ok:
-        world.save()
+        world.mark_dirty(name)
 
-    return redirect(url_for("pet_page", name=name))
+    return redirect(url_for("petverse.pet_page", name=name))
 
 
 # -----------------------------
 # JOB / WORK SYSTEM
 # -----------------------------
-@app.route("/pet/<name>/work", methods=["POST"])
+@bp.route("/pet/<name>/work", methods=["POST"])
+@requires_pet
 def work(name):
-    pet = world.get_pet(name)
-    if not pet:
-        flash("Pet not found.")
-        return redirect(url_for("index"))
+    pet = g.pet
 
-    minutes = int(request.form.get("minutes", 30))
+    minutes = form_minutes(30)
+    if minutes is None:
+        flash("Minutes must be a positive number.")
+        return redirect(url_for("petverse.pet_page", name=name))
     ok, msg = pet.do_job(minutes)
 
     flash(msg)
     if ok:
-        world.save()
+        world.mark_dirty(name)
 
-    return redirect(url_for("pet_page", name=name))
+    return redirect(url_for("petverse.pet_page", name=name))
 
 
 # -----------------------------
 # DELETE PET
 # -----------------------------
-@app.route("/pet/<name>/delete", methods=["POST"])
+@bp.route("/pet/<name>/delete", methods=["POST"])
 def delete(name):
     ok = world.delete_pet(name)
     if ok:
-        world.save()
+        world.mark_dirty(name)
         flash("Pet deleted.")
     else:
         flash("Pet not found.")
-    return redirect(url_for("index"))
+    return redirect(url_for("petverse.index"))
 
 
 # Run server
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app({"DEBUG": True}).run(debug=True)
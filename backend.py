@@ -3,10 +3,34 @@ import time
 import json
 import os
 import random
-from dataclasses import dataclass, asdict, field
-from typing import Dict, Optional, Tuple
+import sys
+import signal
+import atexit
+import threading
+import functools
+import hashlib
+import mmap
+import logging
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import quote
 
-SAVE_FILE = "petverse_pets.json"
+log = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+SAVE_FILE = "petverse_pets.json"  # legacy single-file save, migrated on first load
+SAVE_DIR = "pets"                 # one <name>.<hash>.pet.json per pet
+INDEX_FILE = "index.json"         # list of pet names inside SAVE_DIR
+PET_FILE_SUFFIX = ".pet.json"     # distinct from INDEX_FILE whatever the pet is called
+MAX_PET_FILE_STEM = 200          # quoted names are cut to this to stay under NAME_MAX
+MMAP_MIN_SIZE = 1 << 20          # save files at least this big are parsed via mmap
+SAVE_FLUSH_INTERVAL = 2.0        # at most one background save every 2 seconds
+TICK_INTERVAL = 60.0             # background simulation tick for all pets
 
 # ---------------------------
 # Configuration constants
@@ -15,20 +39,59 @@ HUNGER_INCREASE_PER_HOUR = 2.0
 ENERGY_RECOVER_PER_HOUR = 1.0
 HAPPINESS_DECAY_PER_HOUR = 0.5
 FEED_COST = 5
-SHOP_ITEMS = {
-    "food": {"price": 5, "hunger_restore": 25, "happiness": 5},
-    "toy": {"price": 10, "hunger_restore": 0, "happiness": 20, "energy_cost": 5},
-    "energy_drink": {"price": 8, "energy_restore": 30, "happiness": 2},
-}
+# read-only views: the shop catalogue is fixed at import time
+SHOP_ITEMS = MappingProxyType({
+    "food": MappingProxyType({"price": 5, "hunger_restore": 25, "happiness": 5}),
+    "toy": MappingProxyType({"price": 10, "hunger_restore": 0, "happiness": 20, "energy_cost": 5}),
+    "energy_drink": MappingProxyType({"price": 8, "energy_restore": 30, "happiness": 2}),
+})
 
 # coin-related defaults
 DAILY_REWARD_COINS = 20
 JOB_COIN_RATE_PER_MIN = 1 / 5    # 1 coin per 5 minutes
 PLAY_COIN_REWARD = 1
 REST_COIN_REWARD = 1
-RANDOM_GIFT_CHANCE = 0.05        # 5% chance on refresh/status call
+RANDOM_GIFT_CHANCE = 0.05        # 5% chance per gift roll
+RANDOM_GIFT_INTERVAL = 60.0      # at most one gift roll per minute per pet
 RANDOM_GIFT_MIN = 1
 RANDOM_GIFT_MAX = 5
+REFRESH_MIN_INTERVAL = 1.0       # decay over less than a second is skipped
+
+def _dumps(data, pretty: bool = False) -> bytes:
+    # compact by default; indenting roughly doubles the bytes written
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(",", ":")).encode()
+
+def _loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _day_key(ts: Optional[float] = None) -> int:
+    """Local calendar day as an int (year * 1000 + day of year); cheap to compare."""
+    t = time.localtime(ts)
+    return t.tm_year * 1000 + t.tm_yday
+
+def _locked(method):
+    """Run a Pet method while holding that pet's own lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _read_json(path: str):
+    # unbuffered binary slurp: read() sizes one buffer from the file size and
+    # fills it directly, with no text decoding or extra buffer copy on the way
+    with open(path, "rb", buffering=0) as f:
+        if orjson is not None and os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+            # big files: let orjson parse straight out of the page cache
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+        return _loads(f.read())
 
 class PetFactory:
     TEMPLATES = {
@@ -39,20 +102,11 @@ class PetFactory:
 
     @classmethod
     def create_pet(cls, name: str, species: str):
-        spec = species.lower()
-        template = cls.TEMPLATES.get(spec, cls.TEMPLATES["cat"])
-        return Pet(
-            name=name,
-            species=spec,
-            hunger=template["base_hunger"],
-            happiness=template["base_happiness"],
-            energy=template["max_energy"],
-            max_energy=template["max_energy"],
-            evolve_at=template["evolve_at"],
-            evolution=template["evolution"],
-        )
+        """Build a pet from its species template; `species` must already be lowercase."""
+        factory = _FACTORIES.get(species, _FACTORIES["cat"])
+        return factory(name=name, species=species)
 
-@dataclass
+@dataclass(slots=True)
 class Pet:
     name: str
     species: str
@@ -70,9 +124,16 @@ class Pet:
 
     # NEW fields for coin systems / gifts
     last_daily_claim: float = 0.0
+    last_daily_claim_day: int = 0    # _day_key() of last_daily_claim
     last_gift_time: float = 0.0
     last_gift_amount: int = 0
 
+    # per-pet lock so concurrent requests on one pet don't lose updates;
+    # reentrant because actions call refresh() and _gain_xp() while holding it
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+    # when the random gift was last rolled for; runtime only, not saved
+    _last_gift_roll: float = field(default=0.0, init=False, repr=False, compare=False)
+
     def _apply_time_decay(self, seconds: float):
         hours = seconds / 3600.0
         if hours <= 0:
@@ -92,16 +153,30 @@ class Pet:
             return f"Your pet found {amt} coins!"
         return None
 
-    def refresh(self):
+    @_locked
+    def tick(self) -> bool:
+        """Let time pass (decay only); returns False if too little time has passed."""
         now = time.time()
         elapsed = now - self.last_updated
-        if elapsed > 0:
-            self._apply_time_decay(elapsed)
-            # random gift chance triggers during refresh
+        if elapsed < REFRESH_MIN_INTERVAL:
+            return False
+        self._apply_time_decay(elapsed)
+        self.last_updated = now
+        return True
+
+    @_locked
+    def refresh(self):
+        """tick() plus the random gift; only for pets a user is interacting with."""
+        if not self.tick():
+            return
+        now = self.last_updated
+        # random gift chance rolls on its own, slower schedule
+        if now - self._last_gift_roll >= RANDOM_GIFT_INTERVAL:
+            self._last_gift_roll = now
             self._maybe_random_gift()
-            self.last_updated = now
 
     # ---- actions ----
+    @_locked
     def feed(self, use_item=False, food_strength=20) -> Tuple[bool, str]:
         self.refresh()
         if not use_item:
@@ -115,6 +190,7 @@ class Pet:
         self._gain_xp(10)
         return True, f"Fed {self.name}: hunger {old_hunger:.1f} -> {self.hunger:.1f}"
 
+    @_locked
     def play(self, minutes=10) -> Tuple[bool, str]:
         self.refresh()
         energy_cost = minutes * 0.5
@@ -129,6 +205,7 @@ class Pet:
         self._gain_xp(15 + int(minutes/5))
         return True, f"Played {minutes} min: energy {old_energy:.1f} -> {self.energy:.1f}. +{PLAY_COIN_REWARD} coin."
 
+    @_locked
     def rest(self, minutes=30) -> Tuple[bool, str]:
         self.refresh()
         energy_gain = minutes * 0.8
@@ -142,12 +219,12 @@ class Pet:
     # ---- leveling / evolution ----
     def _gain_xp(self, amount: int):
         self.xp += amount
-        leveled_up = False
-        while self.xp >= 100:
-            self.xp -= 100
-            self.level += 1
-            self.coins += 20
-            leveled_up = True
+        # every 100 xp is one level worth 20 coins; apply them all at once
+        gained_levels, self.xp = divmod(self.xp, 100)
+        leveled_up = gained_levels > 0
+        if leveled_up:
+            self.level += gained_levels
+            self.coins += 20 * gained_levels
         if leveled_up and not self.evolved and self.level >= self.evolve_at:
             self.evolved = True
             return True
@@ -156,15 +233,20 @@ class Pet:
     # ---- new: daily reward ----
     def daily_reward(self) -> Tuple[bool, str]:
         """Give a daily reward if not claimed today."""
-        today = time.strftime("%Y-%m-%d", time.localtime())
-        last_claim_day = time.strftime("%Y-%m-%d", time.localtime(self.last_daily_claim)) if self.last_daily_claim else None
-        if last_claim_day != today:
+        now = time.time()
+        today = _day_key(now)
+        # compare-and-set: the check and the claim happen under one lock hold,
+        # so two concurrent claims can't both see "not claimed yet"
+        with self._lock:
+            if self.last_daily_claim_day == today:
+                return False, "Daily reward already claimed today."
+            self.last_daily_claim_day = today
+            self.last_daily_claim = now
             self.coins += DAILY_REWARD_COINS
-            self.last_daily_claim = time.time()
-            return True, f"Daily reward claimed! +{DAILY_REWARD_COINS} coins."
-        return False, "Daily reward already claimed today."
+        return True, f"Daily reward claimed! +{DAILY_REWARD_COINS} coins."
 
     # ---- new: job / work system ----
+    @_locked
     def do_job(self, minutes: int = 30) -> Tuple[bool, str]:
         """Send pet to work for minutes; earns coins, costs some energy, gives small XP."""
         self.refresh()
@@ -181,37 +263,50 @@ class Pet:
         return True, f"{self.name} worked for {minutes} mins and earned {earned} coins."
 
     # ---- shop usage helper ----
+    @_locked
     def buy_item(self, item_key: str) -> Tuple[bool, str]:
         item = SHOP_ITEMS.get(item_key)
         if not item:
             return False, "Invalid item."
+        handler = _ITEM_HANDLERS.get(item_key)
+        if handler is None:
+            return False, "Unknown item effect."
         if self.coins < item["price"]:
             return False, "Not enough coins."
         self.coins -= item["price"]
-        if item_key == "food":
-            self.hunger = max(0.0, self.hunger - item["hunger_restore"])
-            self.happiness = min(100.0, self.happiness + item.get("happiness", 0))
-            self._gain_xp(5)
-            return True, f"Used food. Hunger -> {self.hunger:.1f}"
-        elif item_key == "toy":
-            energy_cost = item.get("energy_cost", 0)
-            if self.energy < energy_cost:
-                self.coins += item["price"]
-                return False, f"{self.name} is too tired to use the toy."
-            self.energy = max(0.0, self.energy - energy_cost)
-            self.happiness = min(100.0, self.happiness + item["happiness"])
-            self._gain_xp(10)
-            return True, f"Played with toy. Energy -> {self.energy:.1f}"
-        elif item_key == "energy_drink":
-            self.energy = min(self.max_energy, self.energy + item["energy_restore"])
-            self.happiness = min(100.0, self.happiness + item.get("happiness", 0))
-            self._gain_xp(7)
-            return True, f"Drank energy drink. Energy -> {self.energy:.1f}"
-        return False, "Unknown item effect."
+        return handler(self, item)
+
+    def _use_food(self, item) -> Tuple[bool, str]:
+        self.hunger = max(0.0, self.hunger - item["hunger_restore"])
+        self.happiness = min(100.0, self.happiness + item.get("happiness", 0))
+        self._gain_xp(5)
+        return True, f"Used food. Hunger -> {self.hunger:.1f}"
 
+    def _use_toy(self, item) -> Tuple[bool, str]:
+        energy_cost = item.get("energy_cost", 0)
+        if self.energy < energy_cost:
+            self.coins += item["price"]
+            return False, f"{self.name} is too tired to use the toy."
+        self.energy = max(0.0, self.energy - energy_cost)
+        self.happiness = min(100.0, self.happiness + item["happiness"])
+        self._gain_xp(10)
+        return True, f"Played with toy. Energy -> {self.energy:.1f}"
+
+    def _use_energy_drink(self, item) -> Tuple[bool, str]:
+        self.energy = min(self.max_energy, self.energy + item["energy_restore"])
+        self.happiness = min(100.0, self.happiness + item.get("happiness", 0))
+        self._gain_xp(7)
+        return True, f"Drank energy drink. Energy -> {self.energy:.1f}"
+
+    @_locked
     def status(self) -> Dict:
         """Return current status and trigger refresh + possible random gift. Includes recent gift info."""
         self.refresh()
+        return self.view_status()
+
+    @_locked
+    def view_status(self) -> Dict:
+        """Return current status without ticking the simulation; safe for read-only views."""
         gift_msg = None
         # If a gift was received in the last refresh, include it in status:
         if self.last_gift_time and (time.time() - self.last_gift_time) < 5.0:
@@ -232,12 +327,36 @@ class Pet:
         }
 
     # serialization helpers
+    @_locked
     def to_dict(self):
-        data = asdict(self)
-        return data
+        # spelled out rather than asdict(): every field is a primitive, so no
+        # recursive copy is needed (and the lock must be left out anyway)
+        return {
+            "name": self.name,
+            "species": self.species,
+            "hunger": self.hunger,
+            "happiness": self.happiness,
+            "energy": self.energy,
+            "max_energy": self.max_energy,
+            "level": self.level,
+            "xp": self.xp,
+            "coins": self.coins,
+            "last_updated": self.last_updated,
+            "evolve_at": self.evolve_at,
+            "evolution": self.evolution,
+            "evolved": self.evolved,
+            "last_daily_claim": self.last_daily_claim,
+            "last_daily_claim_day": self.last_daily_claim_day,
+            "last_gift_time": self.last_gift_time,
+            "last_gift_amount": self.last_gift_amount,
+        }
 
     @classmethod
     def from_dict(cls, data):
+        # files written by to_dict() carry exactly the init fields, so they can
+        # go straight to __init__; older or partial saves take the slow path
+        if data.keys() == _SAVED_FIELDS:
+            return cls(**data)
         return cls(
             name=data.get("name"),
             species=data.get("species"),
@@ -253,52 +372,277 @@ class Pet:
             evolution=data.get("evolution"),
             evolved=data.get("evolved", False),
             last_daily_claim=data.get("last_daily_claim", 0.0),
+            # older saves only have the timestamp; derive the day key from it
+            last_daily_claim_day=data.get("last_daily_claim_day") or (_day_key(data["last_daily_claim"]) if data.get("last_daily_claim") else 0),
             last_gift_time=data.get("last_gift_time", 0.0),
             last_gift_amount=data.get("last_gift_amount", 0),
         )
 
+# field names to_dict() writes, i.e. everything __init__ accepts
+_SAVED_FIELDS = frozenset(f.name for f in fields(Pet) if f.init)
+
+# species -> Pet constructor with that template's stats already bound
+_FACTORIES = {
+    spec: functools.partial(
+        Pet,
+        hunger=template["base_hunger"],
+        happiness=template["base_happiness"],
+        energy=template["max_energy"],
+        max_energy=template["max_energy"],
+        evolve_at=template["evolve_at"],
+        evolution=template["evolution"],
+    )
+    for spec, template in PetFactory.TEMPLATES.items()
+}
+
+# shop item key -> Pet method applying its effect; buy_item() dispatches here
+_ITEM_HANDLERS = {
+    "food": Pet._use_food,
+    "toy": Pet._use_toy,
+    "energy_drink": Pet._use_energy_drink,
+}
+
 class PetWorld:
-    def __init__(self):
+    def __init__(self, save_dir=SAVE_DIR, pretty: bool = False):
         self.pets: Dict[str, Pet] = {}
+        self.save_dir = save_dir
+        self.pretty = pretty  # indent save files for reading by hand
+        # _lock guards self.pets and the pending-save bookkeeping;
+        # _io_lock keeps two flushes from writing the same files at once.
+        # When both are needed, _io_lock is taken first.
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._pending: Set[str] = set()
+        self._index_dirty = False
+        self._last_flush = 0.0
         # try to auto-load on create
-        if os.path.exists(SAVE_FILE):
-            self.load(SAVE_FILE)
+        if os.path.exists(os.path.join(save_dir, INDEX_FILE)):
+            self.load()
+        elif os.path.exists(SAVE_FILE):
+            # one-time migration from the old single-file save; written by the
+            # first flush once the world is started
+            self.load_legacy(SAVE_FILE)
+            for name in list(self.pets):
+                self.mark_dirty(name)
+            self._index_dirty = True
+        self._started = False
+
+    def start(self):
+        """Start the background flush and tick threads; safe to call more than once.
+
+        Only the process that serves requests should call this: a second
+        process ticking and saving its own copy of the pets would overwrite
+        the server's files.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        # saves happen in the background so request handlers never touch the disk
+        self._flusher = threading.Thread(target=self._flush_loop, name="petworld-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+        # time passes for every pet here, so read-only pages never mutate state
+        self._ticker = threading.Thread(target=self._tick_loop, name="petworld-tick", daemon=True)
+        self._ticker.start()
+
+    def install_sigterm_flush(self) -> bool:
+        """Flush pending saves on SIGTERM, which skips atexit; call from the main thread.
+
+        The previous handler (e.g. the WSGI server's own) still runs afterwards;
+        with none installed the process exits as SIGTERM normally would.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        previous = signal.getsignal(signal.SIGTERM)
+
+        def on_sigterm(signum, frame):
+            # a world that never started has nothing of this process's to save
+            if self._started:
+                self.flush()
+            if callable(previous):
+                previous(signum, frame)
+            elif previous != signal.SIG_IGN:
+                sys.exit(128 + signum)
+
+        signal.signal(signal.SIGTERM, on_sigterm)
+        return True
 
     def create_pet(self, name: str, species: str) -> Tuple[bool, str]:
         name = name.strip()
         if not name:
             return False, "Pet name cannot be empty."
-        if name in self.pets:
-            return False, "A pet with that name already exists."
-        pet = PetFactory.create_pet(name, species)
-        self.pets[name] = pet
+        with self._lock:
+            if name in self.pets:
+                return False, "A pet with that name already exists."
+            pet = PetFactory.create_pet(name, species)
+            self.pets[name] = pet
+            self._index_dirty = True
         return True, f"Pet '{name}' the {species} created."
 
     def get_pet(self, name: str) -> Optional[Pet]:
         return self.pets.get(name)
 
+    def all_pets(self) -> List[Pet]:
+        """Snapshot of the pets, safe to iterate while other threads add or remove pets."""
+        with self._lock:
+            return list(self.pets.values())
+
     def delete_pet(self, name: str) -> bool:
-        if name in self.pets:
-            del self.pets[name]
-            return True
+        with self._lock:
+            if name in self.pets:
+                del self.pets[name]
+                self._index_dirty = True
+                return True
         return False
 
-    def save(self, filename=SAVE_FILE):
-        data = {name: pet.to_dict() for name, pet in self.pets.items()}
-        with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
-        return filename
+    # ---- simulation ----
+    def tick(self):
+        """Advance time (decay only) for every pet; random gifts stay on user-driven refresh()."""
+        # nothing to save: decay is recomputed from last_updated on load
+        for pet in self.all_pets():
+            pet.tick()
+
+    def _tick_loop(self):
+        while True:
+            time.sleep(TICK_INTERVAL)
+            try:
+                self.tick()
+            except Exception:
+                # one bad tick must not stop the simulation for good
+                log.exception("Ticking pets failed")
+
+    # ---- persistence ----
+    def mark_dirty(self, name: str):
+        """Schedule a background save of one pet; cheap enough to call after every change."""
+        with self._lock:
+            self._pending.add(name)
+        self._dirty.set()
 
-    def load(self, filename=SAVE_FILE):
+    def flush(self):
+        """Write pending changes to disk now, if there are any.
+
+        Waits for a flush already in progress, so calling this at exit never
+        returns while the background thread is halfway through a write.
+        """
+        with self._io_lock:
+            with self._lock:
+                if not self._dirty.is_set():
+                    return False
+                # clear first so changes made while saving schedule another flush
+                self._dirty.clear()
+                pending, self._pending = self._pending, set()
+                snapshot = {name: self._snapshot(name) for name in pending}
+                index = self._take_index()
+            # the disk work happens outside _lock so requests never wait on it;
+            # a failed write is logged and re-queued, the rest still go out
+            failed = set()
+            for name, data in snapshot.items():
+                try:
+                    self._write_pet(name, data)
+                except OSError:
+                    log.exception("Saving pet %r failed", name)
+                    failed.add(name)
+            index_failed = False
+            if index is not None:
+                try:
+                    self._write_index(index)
+                except OSError:
+                    log.exception("Saving the pet index failed")
+                    index_failed = True
+            self._last_flush = time.monotonic()
+            if failed or index_failed:
+                with self._lock:
+                    self._pending |= failed
+                    self._index_dirty = self._index_dirty or index_failed
+                self._dirty.set()
+        return True
+
+    def _flush_loop(self):
+        while True:
+            self._dirty.wait()
+            # debounce: a burst of clicks collapses into a single write
+            wait = SAVE_FLUSH_INTERVAL - (time.monotonic() - self._last_flush)
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                self.flush()
+            except Exception:
+                # never let one bad flush switch persistence off for good
+                log.exception("Saving pets failed")
+
+    def _pet_path(self, name: str) -> str:
+        # quote() keeps names like "../x" from escaping the save directory; the
+        # hash of the exact name keeps "Bob" and "bob" apart on case-insensitive
+        # filesystems and keeps truncated long names unique
+        readable = quote(name, safe="")[:MAX_PET_FILE_STEM]
+        digest = hashlib.sha256(name.encode()).hexdigest()[:12]
+        return os.path.join(self.save_dir, f"{readable}.{digest}{PET_FILE_SUFFIX}")
+
+    def _write_json(self, path: str, data):
+        # build the whole payload first so it goes out in one write(), then
+        # swap it in atomically; a crash never leaves a half-written file
+        payload = _dumps(data, self.pretty)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _snapshot(self, name: str) -> Optional[Dict]:
+        pet = self.pets.get(name)
+        return pet.to_dict() if pet is not None else None
+
+    def _take_index(self) -> Optional[list]:
+        if not self._index_dirty:
+            return None
+        self._index_dirty = False
+        return list(self.pets)
+
+    def _write_index(self, names: list):
+        os.makedirs(self.save_dir, exist_ok=True)
+        self._write_json(os.path.join(self.save_dir, INDEX_FILE), names)
+
+    def _write_pet(self, name: str, data: Optional[Dict]) -> str:
+        os.makedirs(self.save_dir, exist_ok=True)
+        path = self._pet_path(name)
+        if data is None:
+            if os.path.exists(path):
+                os.remove(path)
+        else:
+            self._write_json(path, data)
+        return path
+
+    @staticmethod
+    def _restore_pet(pdata) -> Pet:
+        pet = Pet.from_dict(pdata)
+        try:
+            pet.last_updated = float(pdata.get("last_updated", time.time()))
+        except:
+            pet.last_updated = time.time()
+        return pet
+
+    def load(self):
+        index_path = os.path.join(self.save_dir, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return False, "No save file found."
+        names = _read_json(index_path)
+        with self._lock:
+            for name in names:
+                path = self._pet_path(name)
+                if not os.path.exists(path):
+                    continue
+                self.pets[name] = self._restore_pet(_read_json(path))
+            return True, f"Loaded {len(self.pets)} pets."
+
+    def load_legacy(self, filename=SAVE_FILE):
+        """Load the old single-file format ({name: pet_dict})."""
         if not os.path.exists(filename):
             return False, "No save file found."
-        with open(filename, "r") as f:
-            raw = json.load(f)
-        for name, pdata in raw.items():
-            pet = Pet.from_dict(pdata)
-            try:
-                pet.last_updated = float(pdata.get("last_updated", time.time()))
-            except:
-                pet.last_updated = time.time()
-            self.pets[name] = pet
-        return True, f"Loaded {len(self.pets)} pets."
+        raw = _read_json(filename)
+        with self._lock:
+            for name, pdata in raw.items():
+                self.pets[name] = self._restore_pet(pdata)
+            return True, f"Loaded {len(self.pets)} pets."